@@ -4,7 +4,7 @@
 """
 This script processes and tags photos by performing the following tasks:
 1. Reads image files from a source directory.
-2. Converts HEIC images to JPG format while preserving EXIF metadata.
+2. Converts HEIC images to JPG format while preserving EXIF metadata (or keeps HEIC originals with `HEIC_KEEP_ORIGINAL=true`).
 3. Extracts and updates EXIF metadata, including datetime and camera information.
 4. Organizes images into a target directory structure based on their capture date.
 5. Optionally analyzes images to generate additional metadata using external tools.
@@ -12,6 +12,7 @@ This script processes and tags photos by performing the following tasks:
 Modules and Libraries:
 - Uses `Pillow` for image processing.
 - Uses `pillow_heif` for HEIC image support.
+- Heavy modules (Pillow, pillow_heif, piexif, Azure SDK) are imported on first use, so runs with nothing to do start fast.
 - Uses `dotenv` for environment variable management.
 - Uses `ExifTool` for metadata manipulation.
 - Includes custom utility functions for logging, metadata handling, and image analysis.
@@ -19,19 +20,44 @@ Environment Variables:
 - `SOURCE_DIR`: Directory containing the source images.
 - `TARGET_DIR`: Directory for storing processed images in production mode.
 - `TARGET_TEST_DIR`: Directory for storing processed images in test mode.
+- `HEIC_KEEP_ORIGINAL`: Keeps HEIC/HEIF originals in the library instead of converting them to JPG (default false).
+- `HEIC_ANALYSIS_MAX_DIM`: Long edge of the reduced image sent for analysis of kept HEIC files (default 2048).
+- `HEIC_METADATA_SIDECAR`: Writes metadata of HEIC files to an .xmp sidecar instead of the file (see `utils/metadata_utils.py`).
+- `IMPORT_ROOTS_FILE`: JSON file with per-person import roots, weights and default owners (default `.import_roots.json`, see `utils/queue_utils.py`).
+- `QUEUE_REFRESH_EVERY_N_FILES`: How often the import roots are rescanned during a cycle (default 20).
+- `PREVIEW_SIZES`, `PREVIEW_FORMAT`, `PREVIEW_QUALITY`, `PREVIEW_LAYOUT`, `PREVIEW_DIR`: Optional preview generation (see `utils/preview_utils.py`).
+- `PROFILE_MODE`, `PROFILE_EVERY_N_FILES`, `PROFILE_KEEP`, `PROFILE_TOP`: Profiling snapshots of `process_images` (see `utils/profile_utils.py`).
+- `TRIAGE_ENABLED`, `TRIAGE_KEYWORDS`: Local pre-filter that tags screenshots, dark and blank frames without Azure (see `utils/triage_utils.py`).
+- `IO_MAX_BYTES_PER_SEC`, `IO_MAX_IOPS`, `IO_MAX_CONCURRENCY`, `IO_VOLUME_LIMITS`: Disk I/O budget per volume (see `utils/io_utils.py`).
+- `BACKFILL_WORKERS`: Number of parallel analysis workers in backfill mode (default 4).
+- `BACKFILL_BATCH_SIZE`: Number of library files per metadata read and checkpoint (default 200).
+- `BACKFILL_CHECKPOINT`: Path of the backfill checkpoint file (default `LOGS_DIR/backfill-checkpoint.json`).
 Command-line Arguments:
 - `--test` or `-t`: Enables test mode when set to 'y'.
+- `--once`: Processes pending files until the import folder is empty, then exits.
+- `--profile`: Enables profiling mode (same as `PROFILE_MODE=true`).
+- `--backfill`: Tags library files in `TARGET_DIR` that have no `AITags` yet, then exits.
+- `--backfill-reset`: Ignores the saved backfill checkpoint and starts from the beginning.
 Key Features:
 - Test mode (`--test y`) processes files without moving them and enables debug logging.
 - Production mode processes files and moves them to the target directory.
+- Shares processing fairly (weighted) across import roots, so a bulk import does not block other uploads.
 - Automatically handles duplicate filenames by appending an index.
+- Optionally tags screenshots, near-black, blank and scanned images locally instead of calling Azure.
 - Resizes large images for analysis if they exceed the maximum size limit.
+- Optionally writes preview images in several sizes from the same decode used for analysis.
 - Logs detailed information about the processing steps and errors.
 Functions:
 - `process_images()`: Main function that orchestrates the image processing workflow.
+- `run_once()`: Drains the import queue once, for scheduled (cron / Task Scheduler) runs.
+- `backfill_library()`: Walks the library and tags files without AI metadata in place, in parallel.
 Usage:
 Run the script with the appropriate environment variables and optional test mode flag:
     python main.py --test y
+Process pending files once and exit:
+    python main.py --once
+Backfill the existing library (resumable):
+    python main.py --backfill
 """
 
 
@@ -43,10 +69,9 @@ import time
 import traceback
 import shutil
 import subprocess
-from PIL import Image
+from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
-from pillow_heif import register_heif_opener
-register_heif_opener()
 from utils import *
 
 load_dotenv(override=True)
@@ -57,6 +82,8 @@ set_test_mode(is_test)
 source_dir = os.environ.get("SOURCE_DIR")
 action_describe = 'y'
 azureAIVisionMaxImageSize = 20 * 1024 * 1024  # 20 MB
+HEIC_KEEP_ORIGINAL = os.environ.get("HEIC_KEEP_ORIGINAL", "").lower() == "true"
+HEIC_ANALYSIS_MAX_DIM = int(os.environ.get("HEIC_ANALYSIS_MAX_DIM", 2048))
 
 if is_test:
     target_dir = os.environ.get("TARGET_TEST_DIR")
@@ -70,6 +97,21 @@ else:
     action_move = True
     debug_status = False
 
+import_roots = None
+QUEUE_REFRESH_EVERY_N_FILES = int(os.environ.get("QUEUE_REFRESH_EVERY_N_FILES", 20))
+
+def get_import_roots():
+    """
+    Loads the import roots on first use, so modes that do not read SOURCE_DIR (backfill) do not need it.
+    """
+    global import_roots
+    if import_roots is None:
+        if not source_dir:
+            log_warning("SOURCE_DIR is not set — no import roots.")
+            return []
+        import_roots = load_import_roots(source_dir)
+    return import_roots
+
 # ----------------- MAIN PROCESS ------------------
 
 def process_images():
@@ -78,18 +120,36 @@ def process_images():
     start_time = time.time()
     log_info("Script started.")
 
-    all_files = read_files_from_directory(source_dir)
-    all_files.sort()
+    # Started before the first scan, so the walk of the import roots is profiled as well
+    profiler = BatchProfiler("process_images")
+    profiler.start()
+
+    queue = FairQueue(get_import_roots())
+    queue.refresh()
     file_times = []
 
     # session = ExifToolSession()
 
-    for idx, file_in in enumerate(all_files, start=1):
+    idx = 0
+    while True:
+        # Pick up files that arrived meanwhile, so small uploads do not wait for a bulk import to finish
+        if idx and idx % QUEUE_REFRESH_EVERY_N_FILES == 0:
+            queue.refresh()
+            queue.log_stats()
+
+        item = queue.next()
+        if item is None:
+            break
+        root, file_in = item
+        idx += 1
+        success = False
+
         try:
             # Record the start time for processing this file
             file_start = time.time()
             log_debug(f"Processing file: {file_in}")
-            if file_in.lower().endswith(".heic"):
+            keep_heic = HEIC_KEEP_ORIGINAL and file_in.lower().endswith(HEIF_EXTENSIONS)
+            if file_in.lower().endswith(HEIF_EXTENSIONS) and not keep_heic:
                 heic_path = file_in
                 jpg_path = file_in.rsplit(".", 1)[0] + ".jpg"
                 log_info(f"Converting HEIC to JPG: {file_in} -> {jpg_path}")
@@ -98,13 +158,17 @@ def process_images():
                 if not os.path.exists(file_in):
                     log_error(f"File not found: {file_in}")
                     continue
-                with Image.open(heic_path) as image:
-                    image = image.convert("RGB")
-                    image.save(jpg_path, "JPEG")
+                # Decoding and encoding run outside the I/O slots; only the file read and write hold them
+                jpg_data = BytesIO()
+                load_image_pixels(heic_path).convert("RGB").save(jpg_data, "JPEG")
+                with io_slot((jpg_path, jpg_data.getbuffer().nbytes)):
+                    with open(jpg_path, 'wb') as f:
+                        f.write(jpg_data.getbuffer())
 
                 # Copy EXIF data from HEIC to JPG
                 log_debug(f"Copy EXIF data from HEIC to JPG: {file_in}->{jpg_path}")
-                subprocess.run(["exiftool", "-overwrite_original", "-TagsFromFile", heic_path, jpg_path], check=True)
+                with io_slot((heic_path, 0), (jpg_path, 2 * file_size(jpg_path))):
+                    subprocess.run(["exiftool", "-overwrite_original", "-TagsFromFile", heic_path, jpg_path], check=True)
                 # Check if the JPG file was created successfully
                 if not os.path.exists(jpg_path):
                     log_error(f"Failed to create JPG file: {jpg_path}")
@@ -112,20 +176,20 @@ def process_images():
                 else:
                     log_info(f"Successfully created JPG file: {jpg_path}")
                     # Remove the original HEIC file
-                    os.remove(file_in)
+                    with io_slot((file_in, 0)):
+                        os.remove(file_in)
                 file_in = jpg_path
 
             file_start = time.time()
-            progress_bar = render_progress_bar(idx, len(all_files))
+            progress_bar = render_progress_bar(idx, idx + queue.backlog())
             log_info(f"Filename: {os.path.basename(file_in)}")
 
             if not os.path.exists(file_in):
                 log_error(f"File not found: {file_in}")
                 continue
-            with Image.open(file_in) as image:
-
+            with open_image(file_in) as image:
                 log_debug(f"Reading EXIF data from {file_in}")
-                exif_data = image._getexif() or {}
+                exif_data = read_exif_data(image)
 
                 camera_make = exif_data.get(271, '').strip()
                 camera_model = exif_data.get(272, '').strip()
@@ -134,14 +198,15 @@ def process_images():
 
                 # Update EXIF datetime if not present
                 if not exif_data.get(36867) and not exif_data.get(306):
-                    write_datetime_to_exif(file_in, dt)
+                    with io_slot((file_in, 2 * file_size(file_in))):
+                        write_datetime_to_exif(file_in, dt)
 
                 date_yyyy, date_mm, date_dd = f"{dt.year:04}", f"{dt.month:02}", f"{dt.day:02}"
                 time_hh, time_mm, time_ss = f"{dt.hour:02}", f"{dt.minute:02}", f"{dt.second:02}"
 
                 log_info(f"Image Date time: {date_yyyy}-{date_mm}-{date_dd} {time_hh}:{time_mm}:{time_ss}")
                 log_info(f"Camera: '{camera_make} {camera_model}'")
-                cameraOwner = get_metadata_owner(camera_make, camera_model)
+                cameraOwner = get_metadata_owner(camera_make, camera_model, root.owner)
 
                 log_debug(f"Camera Owner: {cameraOwner}")
                 # Create target directory structure based on date
@@ -152,32 +217,62 @@ def process_images():
                 log_debug(f"Destination Directory: {dest_dir}")
                 os.makedirs(dest_dir, exist_ok=True)
 
-                dest_filename = f"{date_yyyy}-{date_mm}-{date_dd}_{time_hh}{time_mm}{time_ss}.jpg"
+                # HEIC originals keep their container in retention mode, everything else ends up as JPG
+                dest_ext = os.path.splitext(file_in)[1].lower() if keep_heic else ".jpg"
+                dest_filename = f"{date_yyyy}-{date_mm}-{date_dd}_{time_hh}{time_mm}{time_ss}{dest_ext}"
                 log_debug(f"Destination Filename: {dest_filename}")
 
+                # The name without extension must be unique: sidecars and tree previews are keyed by it,
+                # so a .jpg and a .heic with the same timestamp must not share it
                 dest_path = os.path.join(dest_dir, dest_filename)
-                if os.path.exists(dest_path):
+                base_name = dest_filename.rsplit('.', 1)[0]
+                if is_basename_taken(dest_dir, base_name):
                     log_debug(f"File already exists: {dest_path}")
                     i = 1
-                    base_name = dest_filename.rsplit('.', 1)[0]
-                    while os.path.exists(os.path.join(dest_dir, f"{base_name}_{i}.jpg")):
+                    while is_basename_taken(dest_dir, f"{base_name}_{i}"):
                         i += 1
-                    dest_filename = f"{base_name}_{i}.jpg"
+                    dest_filename = f"{base_name}_{i}{dest_ext}"
                     log_warning(f"File already exists, new filename: {dest_filename}")
                     dest_path = os.path.join(dest_dir, dest_filename)
 
-                shutil.copy2(file_in, dest_path)
+                copy_size = file_size(file_in)
+                with io_slot((file_in, copy_size), (dest_path, copy_size)):
+                    shutil.copy2(file_in, dest_path)
                 log_debug(f"File copied to {dest_path}")
 
+                # Pixels are decoded only for previews or analysis; tagged files need just the EXIF header
+                ai_described = is_ai_described(file_in)
+                pixel_size = image.size
+                if previews_enabled() or not ai_described:
+                    # A kept HEIC only needs the small analysis payload unless previews need full resolution
+                    reduced_decode = keep_heic and not previews_enabled()
+                    image = load_image_pixels(file_in, HEIC_ANALYSIS_MAX_DIM if reduced_decode else None)
+
+                if previews_enabled():
+                    previews = generate_previews(image, dest_path, target_dir)
+                    log_debug(f"Previews generated: {len(previews)}")
+
                 metadata = {}
-                if is_ai_described(file_in):
+                triage_category = None if ai_described else classify_image(image, exif_data, file_in, pixel_size)
+                if ai_described:
                     log_info(f"Skipping AI analysis (already tagged as AI Described): {file_in}")
+                elif triage_category:
+                    log_info(f"Local triage: {triage_category} — skipping Azure analysis")
+                    apply_exiftool_metadata(
+                        dest_path,
+                        get_triage_metadata(triage_category),
+                        cameraOwner
+                        )
                 else:
                     log_debug(f"Analyzing image: {file_in}")
                     original_size = os.path.getsize(file_in)
                     if original_size == 0:
                         log_error(f"File {file_in} is empty — skipping.")
 
+                    if keep_heic:
+                        image = reduce_image(image, HEIC_ANALYSIS_MAX_DIM)
+                        log_debug(f"Reduced HEIC for analysis to {image.size[0]}x{image.size[1]}px")
+
                     width, height = image.size
 
                     if width > AZURE_IMAGE_MAX_DIM or height > AZURE_IMAGE_MAX_DIM:
@@ -221,15 +316,24 @@ def process_images():
                 log_debug(f"Moving file to {dest_path}")
                 if os.path.exists(dest_path):
                     log_debug(f"Removing original file: {file_in}")
-                    os.remove(file_in)
+                    with io_slot((file_in, 0)):
+                        os.remove(file_in)
 
             file_times.append(time.time() - file_start)
+            success = True
             log_info(f"Done: {file_in}")
 
         except Exception as e:
             tb = traceback.extract_tb(sys.exc_info()[2])[-1]
             log_error(f"Failed: {file_in} | {type(e).__name__} - {e} at {tb.filename}:{tb.lineno}")
 
+        finally:
+            queue.done(root, time.time() - file_start, success)
+            profiler.file_done()
+
+    profiler.stop()
+    queue.log_stats()
+
     # session.close()
 
     # Calculate and log total and average processing times
@@ -238,22 +342,217 @@ def process_images():
     end_time = time.time()
     log_info(f"Script finished. Start: {datetime.fromtimestamp(start_time):%Y-%m-%d %H:%M:%S}, End: {datetime.fromtimestamp(end_time):%Y-%m-%d %H:%M:%S}")
     log_info(f"All done. Total: {total:.2f}s | Avg per file: {avg:.2f}s")
+    return len(file_times)
+
+
+# ----------------- BACKFILL ------------------
+
+BACKFILL_WORKERS = int(os.environ.get("BACKFILL_WORKERS", 4))
+BACKFILL_BATCH_SIZE = int(os.environ.get("BACKFILL_BATCH_SIZE", 200))
+BACKFILL_CHECKPOINT = os.environ.get(
+    "BACKFILL_CHECKPOINT",
+    os.path.join(os.environ.get("LOGS_DIR", "./logs"), "backfill-checkpoint.json")
+    )
+
+def tag_library_file(file_path):
+    """
+    Analyzes a file that is already in the library and writes AI metadata into it in place.
+    Returns True if metadata was written, False if the file cannot be analyzed (empty or too small).
+    Raises an exception if analysis or writing metadata failed and the file should be retried.
+    """
+    original_size = os.path.getsize(file_path)
+    if original_size == 0:
+        log_warning(f"File {file_path} is empty — skipping.")
+        return False
+
+    with open_image(file_path) as image:
+        exif_data = read_exif_data(image)
+        camera_make = exif_data.get(271, '').strip()
+        camera_model = exif_data.get(272, '').strip()
+        cameraOwner = get_metadata_owner(camera_make, camera_model)
+
+        is_heic = file_path.lower().endswith(HEIF_EXTENSIONS)
+        pixel_size = image.size
+        image = load_image_pixels(file_path, HEIC_ANALYSIS_MAX_DIM if is_heic else None)
+
+        triage_category = classify_image(image, exif_data, file_path, pixel_size)
+        if triage_category:
+            log_info(f"Local triage: {triage_category} — skipping Azure analysis")
+            apply_exiftool_metadata(file_path, get_triage_metadata(triage_category), cameraOwner)
+            return True
+
+        if is_heic:
+            image = reduce_image(image, HEIC_ANALYSIS_MAX_DIM)
+
+        width, height = image.size
+        if width < AZURE_IMAGE_MIN_DIM or height < AZURE_IMAGE_MIN_DIM:
+            log_warning(f"Image too small for Azure AI Vision: {file_path} {width}x{height}px — skipping.")
+            return False
+
+        if width > AZURE_IMAGE_MAX_DIM or height > AZURE_IMAGE_MAX_DIM:
+            if width > height:
+                image = rescale_image(image, width=AZURE_IMAGE_MAX_DIM)
+            else:
+                image = rescale_image(image, height=AZURE_IMAGE_MAX_DIM)
+            log_debug(f"Rescaled image down to max {AZURE_IMAGE_MAX_DIM}px")
+
+        if original_size > azureAIVisionMaxImageSize:
+            image_data = resize_image(image, azureAIVisionMaxImageSize)
+        else:
+            image_data = pil_image_to_bytes(image)
+
+    metadata = image_analyse(image_data)
+    if not metadata:
+        raise RuntimeError("Azure Vision API returned no metadata")
+
+    apply_exiftool_metadata(file_path, metadata, cameraOwner)
+    log_info(f"Tagged: {file_path}")
+    return True
+
+def backfill_library(reset=False):
+    """
+    Tags every library file that has no AITags yet.
+    Files are read in sorted order in batches: one ExifTool call finds the untagged files
+    of a batch, a pool of workers analyzes them, and the cursor is checkpointed after each
+    batch so an interrupted run resumes where it stopped. Failed files are stored in the
+    checkpoint and retried at the start of the next run. A completed pass clears the cursor,
+    so the next run checks the whole library again (e.g. photos added to older folders).
+    """
+    start_time = time.time()
+    log_info("Backfill started.")
+    log_info(f"Library directory: {target_dir}")
+    log_info(f"Workers: {BACKFILL_WORKERS}, batch size: {BACKFILL_BATCH_SIZE}")
+
+    if reset:
+        log_info("Backfill checkpoint reset — starting from the beginning.")
+        checkpoint = {"cursor": "", "stats": {"tagged": 0, "already_tagged": 0, "skipped": 0, "failed": 0}, "failed_files": []}
+    else:
+        checkpoint = load_backfill_checkpoint(BACKFILL_CHECKPOINT)
+    cursor = checkpoint["cursor"]
+    stats = checkpoint["stats"]
+    failed_files = set(checkpoint["failed_files"])
+    if not cursor:
+        # A fresh pass reaches every file again, failed ones included, so the counters restart
+        stats = {"tagged": 0, "already_tagged": 0, "skipped": 0, "failed": 0}
+
+    all_files = read_files_from_directory(target_dir)
+    all_files.sort()
+    # Files that failed in earlier runs are retried first, then the library continues after the cursor
+    retry = sorted(f for f in failed_files if f <= cursor and os.path.exists(f))
+    failed_files = set(retry)
+    stats["failed"] = len(failed_files)
+    pending = retry + [f for f in all_files if f > cursor]
+    log_info(f"Library files: {len(all_files)}, retrying failed: {len(retry)}, remaining after checkpoint: {len(pending) - len(retry)}")
+
+    done = 0
+    completed = True
+    with ThreadPoolExecutor(max_workers=BACKFILL_WORKERS) as executor:
+        for batch in split_into_batches(pending, BACKFILL_BATCH_SIZE):
+            described = get_ai_described_files(batch)
+            if described is None:
+                # Without the tag check the whole batch would look untagged and be analyzed (and tagged) again;
+                # stop here so the next run resumes at this batch
+                log_warning(f"Backfill stopped: could not check AI tags of the batch starting at {batch[0]}")
+                completed = False
+                break
+            untagged = [f for f in batch if f not in described]
+            stats["already_tagged"] += len(batch) - len(untagged)
+
+            futures = {executor.submit(tag_library_file, f): f for f in untagged}
+            for future in as_completed(futures):
+                file_path = futures[future]
+                try:
+                    if future.result():
+                        stats["tagged"] += 1
+                    else:
+                        stats["skipped"] += 1
+                    failed_files.discard(file_path)
+                # image_analyse() and apply_exiftool_metadata() report errors with log_error(), which exits;
+                # in a worker that must only fail this file, not end the whole backfill
+                except (Exception, SystemExit) as e:
+                    failed_files.add(file_path)
+                    log_warning(f"Backfill failed: {file_path} | {type(e).__name__} - {e}")
+
+            # Retried files lie before the cursor, so it only ever moves forward
+            failed_files.difference_update(described)
+            stats["failed"] = len(failed_files)
+            cursor = max(cursor, batch[-1])
+            save_backfill_checkpoint(BACKFILL_CHECKPOINT, cursor, stats, failed_files)
+
+            done += len(batch)
+            elapsed = time.time() - start_time
+            rate = done / elapsed if elapsed else 0
+            log_info(f"Backfill {render_progress_bar(done, len(pending), width=40)} {done}/{len(pending)} | {rate:.1f} files/s | {stats}")
+
+    if completed:
+        # The whole library was checked; failed files stay in the checkpoint for the next pass
+        save_backfill_checkpoint(BACKFILL_CHECKPOINT, "", stats, failed_files)
+
+    end_time = time.time()
+    log_info(f"Backfill finished. Start: {datetime.fromtimestamp(start_time):%Y-%m-%d %H:%M:%S}, End: {datetime.fromtimestamp(end_time):%Y-%m-%d %H:%M:%S}")
+    log_info(f"Backfill totals: {stats}")
+
+
+def has_pending_imports():
+    return any(has_pending_files(root.path) for root in get_import_roots())
+
+def read_pending_imports():
+    roots = get_import_roots()
+    return [f for root in roots for f in iter_root_files(root, roots)]
+
+def run_once():
+    """
+    Processes the import queue until it is empty and returns.
+    Stops early if a cycle removed none of the pending files, so files that keep failing
+    do not make the run loop forever.
+    """
+    cycles = 0
+    while has_pending_imports():
+        pending_before = set(read_pending_imports())
+        log_info(f"📸 {len(pending_before)} files pending — starting processing.")
+        process_images()
+        cycles += 1
+        if pending_before <= set(read_pending_imports()):
+            log_warning("No pending files were processed in the last cycle — stopping.")
+            break
+    if cycles == 0:
+        log_info("No new files found.")
+    return cycles
 
 
 SCAN_INTERVAL_SECONDS = os.environ.get("SCAN_INTERVAL_SECONDS", 60)
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Photo Auto Tag Processor")
+    parser.add_argument("--once", action="store_true", help="Process pending files once and exit (for cron / Task Scheduler)")
+    parser.add_argument("--profile", action="store_true", help="Write cProfile/tracemalloc snapshots to LOGS_DIR")
+    parser.add_argument("--backfill", action="store_true", help="Tag library files without AITags and exit")
+    parser.add_argument("--backfill-reset", action="store_true", help="Ignore the saved backfill checkpoint")
+    args = parser.parse_args()
+    if args.profile:
+        set_profiling_mode(True)
+
+    if args.backfill:
+        backfill_library(reset=args.backfill_reset)
+        sys.exit(0)
+
+    if args.once:
+        run_once()
+        sys.exit(0)
+
     log_info("📡 Monitoring started.")
     log_info(f"Scan interval: {SCAN_INTERVAL_SECONDS} seconds")
     log_info(f"Log level: {os.environ.get('LOG_LEVEL', 'INFO').upper()}")
     log_info(f"Source directory: {source_dir}")
+    for root in get_import_roots():
+        log_info(f"Import root '{root.name}': {root.path} (weight {root.weight:g})")
 
     # max_cycles = 5
     # current_cycle = 0
 
     # while current_cycle < max_cycles:
     while True:
-        if has_pending_files(source_dir):
+        if has_pending_imports():
             log_info("📸 New files detected — starting processing.")
             process_images()
         else:
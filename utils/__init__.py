@@ -1,28 +1,71 @@
 from utils.azure_utils import (
     AZURE_IMAGE_MAX_DIM,
     AZURE_IMAGE_MIN_DIM,
+    get_client,
     image_analyse,
 )
 
+from utils.backfill_utils import (
+    load_backfill_checkpoint,
+    save_backfill_checkpoint,
+    split_into_batches,
+)
+
 from utils.exif_utils import (
     get_photo_datetime,
+    read_exif_data,
     write_datetime_to_exif,
 )
 
 from utils.exiftool_session import ExifToolSession
 
 from utils.file_utils import (
+    iter_files_from_directory,
     read_files_from_directory,
+    is_basename_taken,
     move_file_to_unsupported,
     has_pending_files,
 )
 
 from utils.image_utils import (
+    HEIF_EXTENSIONS,
+    open_image,
+    load_image_pixels,
+    reduce_image,
     rescale_image,
     resize_image,
     pil_image_to_bytes,
 )
 
+from utils.io_utils import (
+    io_slot,
+    file_size,
+    order_by_directory,
+)
+
+from utils.queue_utils import (
+    ImportRoot,
+    FairQueue,
+    load_import_roots,
+    iter_root_files,
+)
+
+from utils.preview_utils import (
+    previews_enabled,
+    get_preview_path,
+    generate_previews,
+)
+
+from utils.profile_utils import (
+    BatchProfiler,
+    set_profiling_mode,
+)
+
+from utils.triage_utils import (
+    classify_image,
+    get_triage_metadata,
+)
+
 from utils.log_utils import (
     log_debug,
     log_info,
@@ -36,4 +79,6 @@ from utils.metadata_utils import (
     apply_exiftool_metadata,
     get_metadata_owner,
     is_ai_described,
+    get_ai_described_files,
+    get_sidecar_path,
 )
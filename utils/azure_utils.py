@@ -8,22 +8,19 @@ Purpose:
     Integration with Azure Vision API for image analysis and tag extraction.
 
 Main Functions:
+    - get_client(): Returns the Azure Vision client, importing the Azure SDK and creating the client on first use.
     - image_analyse(image_data): Sends image data to Azure Vision API and returns extracted caption and tags.
 
 Requires Azure credentials configured in the .env file.
+The Azure SDK is imported lazily, so runs that have nothing to analyze do not pay for loading it.
 This module centralizes all Azure Vision API communication for the photo processing pipeline.
 """
 
 import os
-from azure.ai.vision.imageanalysis import ImageAnalysisClient
-from azure.ai.vision.imageanalysis.models import VisualFeatures
-from azure.core.credentials import AzureKeyCredential
-from azure.core.pipeline.transport import RequestsTransport
+import threading
 from dotenv import load_dotenv
 from utils.log_utils import *
 
-transport = RequestsTransport(connection_timeout=10, read_timeout=30)
-
 
 load_dotenv()
 
@@ -32,20 +29,40 @@ AZURE_IMAGE_MIN_DIM = 50
 
 endpoint = os.environ.get("VISION_ENDPOINT")
 key = os.environ.get("VISION_KEY")
-client = ImageAnalysisClient(
-    endpoint=endpoint,
-    credential=AzureKeyCredential(key),
-    transport=transport
-    )
 
-visual_features = [VisualFeatures.TAGS, VisualFeatures.CAPTION]
+client = None
+visual_features = None
+_client_lock = threading.Lock()
+
+def get_client():
+    """
+    Returns the shared ImageAnalysisClient, creating it on first use.
+    """
+    global client, visual_features
+    with _client_lock:
+        if client is None:
+            from azure.ai.vision.imageanalysis import ImageAnalysisClient
+            from azure.ai.vision.imageanalysis.models import VisualFeatures
+            from azure.core.credentials import AzureKeyCredential
+            from azure.core.pipeline.transport import RequestsTransport
+
+            transport = RequestsTransport(connection_timeout=10, read_timeout=30)
+            client = ImageAnalysisClient(
+                endpoint=endpoint,
+                credential=AzureKeyCredential(key),
+                transport=transport
+                )
+            visual_features = [VisualFeatures.TAGS, VisualFeatures.CAPTION]
+            log_debug("Azure Vision client created")
+    return client
 
 def image_analyse(image_data):
 
     log_debug("Analyzing image...")
 
     try:
-        result = client.analyze(
+        vision_client = get_client()
+        result = vision_client.analyze(
             image_data=image_data,
             visual_features=visual_features,
             gender_neutral_caption=True
@@ -0,0 +1,74 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Chris Polewiak
+
+"""
+backfill_utils.py
+
+Purpose:
+    Checkpoint handling for the library backfill (re-tag) mode.
+
+Main Functions:
+    - load_backfill_checkpoint(path): Loads the saved cursor, counters and failed files, or returns an empty checkpoint.
+    - save_backfill_checkpoint(path, cursor, stats, failed_files): Atomically writes the checkpoint to disk.
+    - split_into_batches(files, batch_size): Yields consecutive slices of the file list.
+
+The cursor is the last library path (in sorted order) whose batch was fully processed,
+so an interrupted backfill resumes right after it instead of rescanning the whole library.
+Files that failed before the cursor are kept in the checkpoint and retried first on the next run.
+An empty cursor means no pass is in progress; the next run checks the whole library.
+"""
+
+import os
+import json
+from datetime import datetime
+from utils.log_utils import *
+
+
+def load_backfill_checkpoint(path):
+    """
+    Loads the backfill checkpoint from a JSON file.
+    Returns an empty checkpoint if the file does not exist or cannot be read.
+    """
+    checkpoint = {"cursor": "", "stats": {"tagged": 0, "already_tagged": 0, "skipped": 0, "failed": 0}, "failed_files": []}
+    if not os.path.exists(path):
+        log_debug(f"No backfill checkpoint found at {path}")
+        return checkpoint
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            saved = json.load(f)
+        checkpoint["cursor"] = saved.get("cursor", "")
+        checkpoint["stats"].update(saved.get("stats", {}))
+        checkpoint["failed_files"] = list(saved.get("failed_files", []))
+        log_info(f"Resuming backfill after: {checkpoint['cursor']} ({len(checkpoint['failed_files'])} failed files to retry)")
+    except Exception as e:
+        log_warning(f"Could not read backfill checkpoint {path}: {e}")
+    return checkpoint
+
+def save_backfill_checkpoint(path, cursor, stats, failed_files=()):
+    """
+    Writes the backfill cursor, counters and failed files to a JSON file.
+    The file is replaced atomically so a crash never leaves a half-written checkpoint.
+    """
+    tmp_path = f"{path}.tmp"
+    data = {
+        "cursor": cursor,
+        "stats": stats,
+        "failed_files": sorted(failed_files),
+        "updated": f"{datetime.now():%Y-%m-%d %H:%M:%S}",
+    }
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+        log_debug(f"Backfill checkpoint saved: {cursor}")
+    except Exception as e:
+        log_warning(f"Could not save backfill checkpoint {path}: {e}")
+
+def split_into_batches(files, batch_size):
+    """
+    Yields consecutive slices of the given list with at most batch_size items.
+    """
+    batch_size = max(1, int(batch_size))
+    for start in range(0, len(files), batch_size):
+        yield files[start:start + batch_size]
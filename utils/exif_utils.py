@@ -8,21 +8,37 @@ Purpose:
     Utility functions for reading, extracting, and writing EXIF metadata in image files.
 
 Main Functions:
+    - read_exif_data(image):
+        Returns the EXIF tags of an opened JPEG or HEIC image as a flat dict (IFD0 and Exif IFD).
     - get_photo_datetime(exif_data, filename): 
         Extracts the photo's datetime from EXIF data if available, or tries to parse it from the filename.
         Returns a datetime object or logs an error if not found.
     - write_datetime_to_exif(file_path, dt): 
-        Writes the given datetime to the EXIF DateTime, DateTimeOriginal, and DateTimeDigitized fields in the image file.
+        Writes the given datetime to the EXIF DateTime, DateTimeOriginal, and DateTimeDigitized fields in the image file
+        (with piexif for JPEG, with ExifTool for HEIC/HEIF).
 
 This module is used by the main processing script to ensure correct and consistent date metadata in images.
 """
 
 from datetime import datetime
-import piexif
 import re
+import subprocess
 from utils.log_utils import *
 
 
+def read_exif_data(image):
+    """
+    Returns the EXIF tags of a PIL image as a flat dict.
+    JPEG images use _getexif(); other formats (HEIC) merge IFD0 with the Exif IFD.
+    """
+    if hasattr(image, "_getexif"):
+        return image._getexif() or {}
+    exif = image.getexif()
+    exif_data = dict(exif)
+    exif_data.update(exif.get_ifd(0x8769))
+    return exif_data
+
+
 def get_photo_datetime(exif_data, filename):
     """
     Extracts the photo datetime from EXIF data or, if unavailable, from the filename.
@@ -54,6 +70,19 @@ def write_datetime_to_exif(file_path, dt: datetime):
     """
     Writes the given datetime to the EXIF DateTime, DateTimeOriginal, and DateTimeDigitized fields.
     """
+    if file_path.lower().endswith(('.heic', '.heif')):
+        dt_string = dt.strftime("%Y:%m:%d %H:%M:%S")
+        subprocess.run(
+            ["exiftool", "-overwrite_original", "-P",
+             f"-ModifyDate={dt_string}", f"-DateTimeOriginal={dt_string}", f"-CreateDate={dt_string}",
+             file_path],
+            check=True
+            )
+        log_info(f"EXIF datetime written to file: {dt_string}")
+        return
+
+    import piexif
+
     exif_dict = piexif.load(file_path)
     dt_string = dt.strftime("%Y:%m:%d %H:%M:%S")
     exif_dict["0th"][piexif.ImageIFD.DateTime] = dt_string
@@ -9,7 +9,10 @@ Purpose:
 
 Main Functions:
     - is_valid_path(path): Checks if a path is valid by ensuring all directory parts start with an alphanumeric character.
+    - iter_files_from_directory(directory_path, exclude_dirs): Yields .jpg, .jpeg, .heic and .heif files lazily, excluding hidden/system directories
+      and the given directories.
     - read_files_from_directory(directory_path): Reads all .jpg, .jpeg, and .heic files from a directory, excluding hidden/system directories.
+    - is_basename_taken(directory_path, base_name): Checks if a file with the given name exists in any format (including .xmp sidecars).
     - move_file_to_unsupported(src): Moves a file to the unsupported directory.
     - has_pending_files(directory): Checks if there are any pending files in a directory, excluding hidden/system directories.
 
@@ -17,6 +20,7 @@ Use this module for all file system interactions in the project.
 """
 
 import os
+import glob
 from utils.log_utils import *
 
 
@@ -31,19 +35,20 @@ def is_valid_path(path):
             return False
     return True
 
-def read_files_from_directory(directory_path):
+def iter_files_from_directory(directory_path, exclude_dirs=()):
     """
-    Reads all .jpg, .jpeg, and .heic files from a given directory,
-    excluding files in hidden or system directories.
+    Yields all .jpg, .jpeg, .heic and .heif files from a given directory,
+    excluding files in hidden or system directories and in any of exclude_dirs.
     """
-    log_debug(f"Reading files from directory: {directory_path}")
-    files = []
-    
+    exclude_dirs = {os.path.normpath(d) for d in exclude_dirs}
     for root, dirs, filenames in os.walk(directory_path):
         original_dirs = list(dirs)
         # Exclude subdirectories that start with non-alphanumeric characters
         EXCLUDED_PREFIXES = ('.', '_', '@')
         dirs[:] = [d for d in dirs if d and d[0] not in EXCLUDED_PREFIXES]
+        # Do not descend into directories scanned separately (e.g. nested import roots)
+        if exclude_dirs:
+            dirs[:] = [d for d in dirs if os.path.normpath(os.path.join(root, d)) not in exclude_dirs]
 
         # Log which directories are being skipped
         skipped_dirs = [d for d in original_dirs if d not in dirs]
@@ -51,15 +56,30 @@ def read_files_from_directory(directory_path):
             log_debug(f"Skipping directory: {os.path.join(root, skipped)}")
 
         for filename in filenames:
-            if filename.lower().endswith(('.jpg', '.jpeg', '.heic')):
+            if filename.lower().endswith(('.jpg', '.jpeg', '.heic', '.heif')):
                 full_path = os.path.join(root, filename)
                 # Include file only if the path is considered valid
                 if is_valid_path(full_path):
-                    files.append(full_path)
+                    yield full_path
 
+def read_files_from_directory(directory_path):
+    """
+    Reads all .jpg, .jpeg, .heic and .heif files from a given directory,
+    excluding files in hidden or system directories.
+    """
+    log_debug(f"Reading files from directory: {directory_path}")
+    files = list(iter_files_from_directory(directory_path))
     log_debug(f"Total files found: {len(files)}")
     return files
 
+def is_basename_taken(directory_path, base_name):
+    """
+    Returns True if any file named base_name.<any extension> exists in the directory
+    (photos in any format as well as .xmp sidecars).
+    """
+    pattern = os.path.join(glob.escape(directory_path), glob.escape(base_name) + ".*")
+    return bool(glob.glob(pattern))
+
 def move_file_to_unsupported(src):
     """
     Moves a file to the unsupported directory.
@@ -84,8 +104,7 @@ def move_file_to_unsupported(src):
 def has_pending_files(directory_path):
     """
     Returns True if there are files to process in the directory.
-    Uses the same logic as read_files_from_directory.
+    Uses the same logic as read_files_from_directory, but stops at the first file found.
     """
-    files = read_files_from_directory(directory_path)
-    return len(files) > 0
+    return next(iter_files_from_directory(directory_path), None) is not None
 
@@ -8,6 +8,10 @@ Purpose:
     Utility functions for image manipulation, such as resizing images to fit a maximum file size.
 
 Main Functions:
+    - open_image(path, fp=None): Opens an image with Pillow, loading Pillow and the HEIF opener lazily.
+    - read_image_file(path): Reads a whole file into memory inside an I/O governor slot.
+    - load_image_pixels(path, max_dim): Reads a file under the I/O budget and decodes it outside of it, optionally at reduced size.
+    - reduce_image(image, max_dim): Cheaply downscales an image with an integer reduce so the long edge fits max_dim.
     - resize_image(img, max_size_bytes): Compresses and resizes a PIL Image object to ensure it does not exceed the specified size in bytes.
     - rescale_image(image, height=None, width=None): Rescales the image to a specified height or width while maintaining the aspect ratio.
     - pil_image_to_bytes(image, format="JPEG"): Converts a PIL Image object to bytes in the specified format.
@@ -17,11 +21,68 @@ This module is used to prepare images for processing or uploading by reducing th
 
 import io
 from io import BytesIO
-from PIL import Image
 from utils.log_utils import *
+from utils.io_utils import io_slot, file_size
 
 
+HEIF_EXTENSIONS = ('.heic', '.heif')
+_heif_registered = False
+
+def open_image(path, fp=None):
+    """
+    Opens an image with Pillow. Pillow is imported on first use and the HEIF opener
+    is registered only when a HEIC/HEIF file actually needs to be opened.
+    If fp is given, the image is read from it; path is then used only for the file type.
+    """
+    global _heif_registered
+    from PIL import Image
+    if not _heif_registered and path.lower().endswith(HEIF_EXTENSIONS):
+        from pillow_heif import register_heif_opener
+        register_heif_opener()
+        _heif_registered = True
+        log_debug("HEIF opener registered")
+    return Image.open(fp if fp is not None else path)
+
+def read_image_file(path):
+    """
+    Reads the whole file into a BytesIO buffer. Only the read holds an I/O governor slot.
+    """
+    with io_slot((path, file_size(path))):
+        with open(path, 'rb') as f:
+            return BytesIO(f.read())
+
+def load_image_pixels(path, max_dim=None):
+    """
+    Returns the decoded image of a file. Call it only when pixels are needed; EXIF and size
+    are available from open_image() without decoding.
+    The file bytes are read inside an I/O governor slot and decoded after the slot is released,
+    so CPU-bound decoding does not hold back other file operations on the device.
+    With max_dim, the decoder is asked for a reduced decode (JPEG DCT scaling, or an embedded
+    HEIC thumbnail of at least that size with pillow_heif); formats without one decode in full.
+    """
+    image = open_image(path, read_image_file(path))
+    if max_dim:
+        try:
+            image.draft(None, (max_dim, max_dim))
+        except Exception as e:
+            log_debug(f"Reduced decode not available for {path}: {e}")
+    image.load()
+    return image
+
+def reduce_image(image, max_dim):
+    """
+    Downscales the image with an integer box reduce so its long edge is at most max_dim
+    and returns an RGB image. Much cheaper than a Lanczos resize for analysis payloads.
+    """
+    factor = -(-max(image.size) // max_dim)
+    if factor > 1:
+        image = image.reduce(factor)
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    return image
+
 def resize_image(img, max_size_bytes):
+    from PIL import Image
 
     log_info(f"Resizing image to under {max_size_bytes / (1024 * 1024)} MB")
     img_format = img.format or "JPEG"
@@ -53,6 +114,7 @@ def rescale_image(image, height=None, width=None):
     """
     Rescale the image to a specified height while maintaining the aspect ratio.
     """
+    from PIL import Image
     original_width, original_height = image.size
     log_debug(f"Original image size: {original_width}x{original_height}")
 
@@ -0,0 +1,178 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Chris Polewiak
+
+"""
+io_utils.py
+
+Purpose:
+    Disk I/O governor that keeps the photo pipeline from saturating the NAS volumes.
+
+Main Functions:
+    - io_slot(*accesses): Context manager wrapping a file operation; waits for a per-device
+      concurrency slot and for the bytes/sec and IOPS budget of every volume touched.
+    - file_size(path): Returns the size of a file, or 0 if it does not exist.
+    - order_by_directory(files): Sorts files so each directory is processed in one sequential run.
+
+Configuration (environment variables):
+    - IO_MAX_BYTES_PER_SEC: Default bytes/sec budget per volume (0 = unlimited).
+    - IO_MAX_IOPS: Default operations/sec budget per volume (0 = unlimited).
+    - IO_MAX_CONCURRENCY: Default number of concurrent operations per device (0 = unlimited).
+    - IO_VOLUME_LIMITS: JSON object overriding the defaults per volume, keyed by any path on the volume, e.g.
+      {"/data/library": {"bytes_per_sec": 40000000, "iops": 100, "concurrency": 1}}
+
+Volumes are identified by device id (st_dev), so the import and library folders share one
+budget when they live on the same RAID volume.
+"""
+
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+from utils.log_utils import *
+
+
+IO_MAX_BYTES_PER_SEC = int(os.environ.get("IO_MAX_BYTES_PER_SEC", 0))
+IO_MAX_IOPS = int(os.environ.get("IO_MAX_IOPS", 0))
+IO_MAX_CONCURRENCY = int(os.environ.get("IO_MAX_CONCURRENCY", 2))
+
+
+class _TokenBucket:
+    """
+    Thread-safe token bucket. Consumers may go into debt and then sleep it off,
+    so a single large file is throttled instead of blocked forever.
+    """
+    def __init__(self, rate):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def consume(self, amount):
+        if self.rate <= 0 or amount <= 0:
+            return
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= amount
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0
+        if wait > 0:
+            time.sleep(wait)
+
+
+class _Device:
+    def __init__(self, bytes_per_sec, iops, concurrency):
+        self.bandwidth = _TokenBucket(bytes_per_sec)
+        self.iops = _TokenBucket(iops)
+        self.slots = threading.BoundedSemaphore(concurrency) if concurrency > 0 else None
+
+
+_devices = {}
+_devices_lock = threading.Lock()
+_held = threading.local()
+
+
+def _device_id(path):
+    """
+    Returns the device id of the path, or of its nearest existing parent for files not created yet.
+    """
+    path = os.path.abspath(path)
+    while True:
+        try:
+            return os.stat(path).st_dev
+        except OSError:
+            parent = os.path.dirname(path)
+            if parent == path:
+                return None
+            path = parent
+
+def _load_volume_limits():
+    """
+    Parses IO_VOLUME_LIMITS and maps each configured volume to its device id.
+    """
+    raw = os.environ.get("IO_VOLUME_LIMITS", "").strip()
+    if not raw:
+        return {}
+    try:
+        config = json.loads(raw)
+    except Exception as e:
+        log_warning(f"Invalid IO_VOLUME_LIMITS, using defaults: {e}")
+        return {}
+    limits = {}
+    for volume_path, volume_limits in config.items():
+        dev = _device_id(volume_path)
+        if dev is None:
+            log_warning(f"IO_VOLUME_LIMITS: volume not found: {volume_path}")
+            continue
+        limits[dev] = volume_limits
+        log_debug(f"I/O limits for {volume_path} (device {dev}): {volume_limits}")
+    return limits
+
+_volume_limits = _load_volume_limits()
+
+
+def _get_device(dev):
+    with _devices_lock:
+        device = _devices.get(dev)
+        if device is None:
+            limits = _volume_limits.get(dev, {})
+            device = _Device(
+                int(limits.get("bytes_per_sec", IO_MAX_BYTES_PER_SEC)),
+                int(limits.get("iops", IO_MAX_IOPS)),
+                int(limits.get("concurrency", IO_MAX_CONCURRENCY)),
+                )
+            _devices[dev] = device
+        return device
+
+def file_size(path):
+    """
+    Returns the file size in bytes, or 0 if the file does not exist.
+    """
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+@contextmanager
+def io_slot(*accesses):
+    """
+    Wraps a file operation touching one or more files.
+    Each access is a (path, nbytes) tuple. Slots are taken in device order to avoid deadlocks
+    and are re-entrant per thread, so nested calls on the same device never block themselves.
+    """
+    held = getattr(_held, "devices", None)
+    if held is None:
+        held = _held.devices = set()
+
+    per_device = {}
+    for path, nbytes in accesses:
+        dev = _device_id(path)
+        if dev is None:
+            continue
+        ops, total = per_device.get(dev, (0, 0))
+        per_device[dev] = (ops + 1, total + max(0, nbytes))
+
+    acquired = []
+    try:
+        for dev in sorted(per_device):
+            device = _get_device(dev)
+            if device.slots is not None and dev not in held:
+                device.slots.acquire()
+                held.add(dev)
+                acquired.append(dev)
+            ops, total = per_device[dev]
+            device.iops.consume(ops)
+            device.bandwidth.consume(total)
+        yield
+    finally:
+        for dev in acquired:
+            held.discard(dev)
+            _devices[dev].slots.release()
+
+def order_by_directory(files):
+    """
+    Sorts files by directory first and name second, so each folder is read in one sequential
+    run instead of interleaving directories and forcing seeks on spinning disks.
+    """
+    return sorted(files, key=lambda f: (os.path.dirname(f), os.path.basename(f)))
@@ -39,7 +39,7 @@ log_level = getattr(logging, log_level_str, logging.INFO)
 logger.setLevel(log_level)
 
 # Log to file
-file_handler = RotatingFileHandler(log_path, maxBytes=5*1024*1024, backupCount=5)
+file_handler = RotatingFileHandler(log_path, maxBytes=5*1024*1024, backupCount=5, delay=True)
 formatter = logging.Formatter('[%(levelname)s] %(asctime)s %(message)s', "%Y-%m-%d %H:%M:%S")
 file_handler.setFormatter(formatter)
 logger.addHandler(file_handler)
@@ -8,9 +8,13 @@ Purpose:
     Functions for applying and managing metadata (EXIF, XMP, IPTC) in image files.
 
 Main Functions:
-    - apply_exiftool_metadata(file_path, metadata, owner_info, session): Applies metadata to an image using ExifTool.
-    - get_metadata_owner(make, model): Returns author/copyright info based on camera make/model.
-    - is_ai_edited(file_path): Checks if an image has been marked as AI edited in its metadata.
+    - apply_exiftool_metadata(file_path, metadata, owner_info, session): Applies metadata to an image using ExifTool
+      (or to its .xmp sidecar for HEIC files when HEIC_METADATA_SIDECAR=true).
+    - get_sidecar_path(file_path): Returns the .xmp sidecar path of an image.
+    - get_metadata_owner(make, model, default_owner): Returns author/copyright info based on camera make/model (.camera_owners.json is read on first use),
+      falling back to default_owner for unknown cameras.
+    - is_ai_edited(file_path): Checks if an image (or its HEIC sidecar) has been marked as AI edited in its metadata.
+    - get_ai_described_files(file_paths): Returns the files already tagged with AITags using one batched ExifTool call, or None if the check failed.
 
 This module centralizes all metadata writing logic for the photo processing pipeline.
 """
@@ -19,6 +23,24 @@ import os
 import json
 import subprocess
 from utils.log_utils import *
+from utils.io_utils import io_slot, file_size
+from utils.image_utils import HEIF_EXTENSIONS
+
+
+HEIC_METADATA_SIDECAR = os.environ.get("HEIC_METADATA_SIDECAR", "").lower() == "true"
+
+
+def get_sidecar_path(file_path):
+    """
+    Returns the path of the XMP sidecar for an image (photo.heic -> photo.xmp).
+    """
+    return os.path.splitext(file_path)[0] + ".xmp"
+
+def uses_sidecar(file_path):
+    """
+    Returns True if metadata of this file is written to an XMP sidecar instead of the file itself.
+    """
+    return HEIC_METADATA_SIDECAR and file_path.lower().endswith(HEIF_EXTENSIONS)
 
 
 def apply_exiftool_metadata(file_path, metadata, owner_info=None, session=None):
@@ -66,39 +88,115 @@ def apply_exiftool_metadata(file_path, metadata, owner_info=None, session=None):
             args.append(f'-XMP-dc:Subject+={kw}')
             args.append(f'-XMP-lr:HierarchicalSubject+=AITags|{kw}')
 
-    args.append(file_path)
+    if uses_sidecar(file_path):
+        sidecar_path = get_sidecar_path(file_path)
+        log_debug(f"Writing metadata to sidecar: {sidecar_path}")
+        if os.path.exists(sidecar_path):
+            args.append(sidecar_path)
+        else:
+            args += ['-o', sidecar_path, file_path]
+        io_access = (sidecar_path, 2 * file_size(sidecar_path))
+    else:
+        args.append(file_path)
+        io_access = (file_path, 2 * file_size(file_path))
 
     try:
-        if session:
-            session.run_command(args)
-        else:
-            subprocess.run(["exiftool"] + args, check=True)
+        # ExifTool reads the whole file and writes a rewritten copy
+        with io_slot(io_access):
+            if session:
+                session.run_command(args)
+            else:
+                subprocess.run(["exiftool"] + args, check=True)
 
     except subprocess.CalledProcessError as e:
         log_error(f"ExifTool failed: {e}")
 
-with open('.camera_owners.json', 'r', encoding='utf-8') as f:
-    CAMERA_OWNERS = json.load(f)
-
-def get_metadata_owner(make, model):
+CAMERA_OWNERS = None
+
+def load_camera_owners():
+    """
+    Loads .camera_owners.json on first use and returns the cached mapping.
+    """
+    global CAMERA_OWNERS
+    if CAMERA_OWNERS is None:
+        with open('.camera_owners.json', 'r', encoding='utf-8') as f:
+            CAMERA_OWNERS = json.load(f)
+    return CAMERA_OWNERS
+
+def get_metadata_owner(make, model, default_owner=None):
+    """
+    Returns the owner of the camera from .camera_owners.json.
+    For unknown cameras returns default_owner (e.g. the owner of the import root) or the 'Unknown' entry.
+    """
+    camera_owners = load_camera_owners()
     key = f"{make} {model}"
-    owner = CAMERA_OWNERS.get(key)
+    owner = camera_owners.get(key)
     if not owner:
-        owner = CAMERA_OWNERS.get('Unknown')
+        owner = default_owner or camera_owners.get('Unknown')
         log_warning(f"Uknown camera: {key}")
     return owner
 
 def is_ai_described(file_path):
     log_debug(f"Checking if {file_path} is AI described")
+    # HEIC files may carry their tags in an .xmp sidecar instead
+    candidates = [file_path]
+    sidecar_path = get_sidecar_path(file_path)
+    if file_path.lower().endswith(HEIF_EXTENSIONS) and os.path.exists(sidecar_path):
+        candidates.append(sidecar_path)
     try:
-        result = subprocess.run(
-            ["exiftool", "-s3", "-XMP-lr:HierarchicalSubject", file_path],
-            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
-        )
-        line = result.stdout.strip()
-        tags = [tag.strip() for tag in line.split(",")]
-        log_debug(f"AI tags found: {tags}")
-        return any(tag.startswith("AITags") for tag in tags)
+        for candidate in candidates:
+            with io_slot((candidate, 0)):
+                result = subprocess.run(
+                    ["exiftool", "-s3", "-XMP-lr:HierarchicalSubject", candidate],
+                    stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+                )
+            line = result.stdout.strip()
+            tags = [tag.strip() for tag in line.split(",")]
+            log_debug(f"AI tags found: {tags}")
+            if any(tag.startswith("AITags") for tag in tags):
+                return True
+        return False
     except Exception as e:
         log_warning(f"Could not check AI tags for {file_path}: {e}")
-        return False
\ No newline at end of file
+        return False
+
+def get_ai_described_files(file_paths):
+    """
+    Returns the subset of file_paths already tagged with AITags.
+    Reads the tags of the whole list with a single ExifTool call instead of one call per file.
+    Returns None if the tags could not be read, so callers do not treat the files as untagged.
+    """
+    if not file_paths:
+        return set()
+    log_debug(f"Checking AI tags for {len(file_paths)} files")
+    # Sidecars of HEIC files are read in the same call and mapped back to their image
+    sidecars = {}
+    for path in file_paths:
+        sidecar_path = get_sidecar_path(path)
+        if path.lower().endswith(HEIF_EXTENSIONS) and os.path.exists(sidecar_path):
+            sidecars[sidecar_path] = path
+    read_paths = list(file_paths) + list(sidecars)
+    try:
+        with io_slot(*[(path, 0) for path in read_paths]):
+            result = subprocess.run(
+                ["exiftool", "-j", "-XMP-lr:HierarchicalSubject", "-@", "-"],
+                input="\n".join(read_paths),
+                stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+            )
+        if not result.stdout.strip():
+            raise RuntimeError(result.stderr.strip() or f"exiftool exited with code {result.returncode}")
+        entries = json.loads(result.stdout)
+    except Exception as e:
+        log_warning(f"Could not check AI tags for batch of {len(file_paths)} files: {e}")
+        return None
+
+    described = set()
+    for entry in entries:
+        tags = entry.get("HierarchicalSubject", [])
+        if isinstance(tags, str):
+            tags = [tag.strip() for tag in tags.split(",")]
+        if any(str(tag).startswith("AITags") for tag in tags):
+            source_file = entry.get("SourceFile")
+            described.add(sidecars.get(source_file, source_file))
+    log_debug(f"AI described in batch: {len(described)}/{len(file_paths)}")
+    return described
@@ -0,0 +1,116 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Chris Polewiak
+
+"""
+preview_utils.py
+
+Purpose:
+    Optional generation of preview/thumbnail images from an image that is already decoded,
+    so our own gallery does not have to decode every library photo again.
+    Synology Photos does not read these files and still generates its own thumbnails.
+
+Main Functions:
+    - previews_enabled(): Returns True if at least one preview size is configured.
+    - get_preview_path(dest_path, size, library_root): Returns where the preview of a given size is stored.
+    - generate_previews(image, dest_path, library_root): Writes all configured preview sizes for a library file.
+
+Configuration (environment variables):
+    - PREVIEW_SIZES: Comma separated long-edge sizes in px, e.g. "256,1024,2048" (empty = disabled).
+    - PREVIEW_FORMAT: WEBP or JPEG (default WEBP).
+    - PREVIEW_QUALITY: Encoder quality (default 80).
+    - PREVIEW_LAYOUT: "eadir" stores previews next to the photo in @eaDir/<filename>/,
+      "tree" stores them in PREVIEW_DIR mirroring the library structure (default eadir).
+    - PREVIEW_DIR: Root of the preview tree for the "tree" layout.
+
+Sizes are produced as a cascade from largest to smallest, each one resized from the previous
+result with Pillow's reducing_gap (a cheap integer reduce followed by a short Lanczos pass),
+so only the first step touches the full-resolution pixels.
+"""
+
+import os
+from io import BytesIO
+from utils.log_utils import *
+from utils.io_utils import io_slot
+
+
+PREVIEW_SIZES = sorted(
+    {int(s) for s in os.environ.get("PREVIEW_SIZES", "").split(",") if s.strip().isdigit() and int(s) > 0},
+    reverse=True
+    )
+PREVIEW_FORMAT = os.environ.get("PREVIEW_FORMAT", "WEBP").upper()
+PREVIEW_QUALITY = int(os.environ.get("PREVIEW_QUALITY", 80))
+PREVIEW_LAYOUT = os.environ.get("PREVIEW_LAYOUT", "eadir").lower()
+PREVIEW_DIR = os.environ.get("PREVIEW_DIR", "")
+
+PREVIEW_EXTENSIONS = {"WEBP": "webp", "JPEG": "jpg"}
+
+# EXIF Orientation -> transpose needed to display the image upright
+EXIF_ORIENTATION_TRANSPOSE = {
+    2: "FLIP_LEFT_RIGHT",
+    3: "ROTATE_180",
+    4: "FLIP_TOP_BOTTOM",
+    5: "TRANSPOSE",
+    6: "ROTATE_270",
+    7: "TRANSVERSE",
+    8: "ROTATE_90",
+}
+
+
+def previews_enabled():
+    return bool(PREVIEW_SIZES)
+
+def get_preview_path(dest_path, size, library_root):
+    """
+    Returns the path of the preview of the given size for a library file.
+    """
+    extension = PREVIEW_EXTENSIONS.get(PREVIEW_FORMAT, "jpg")
+    filename = os.path.basename(dest_path)
+    if PREVIEW_LAYOUT == "tree" and PREVIEW_DIR:
+        relative = os.path.relpath(dest_path, library_root)
+        base_name = os.path.splitext(relative)[0]
+        return os.path.join(PREVIEW_DIR, f"{base_name}_{size}.{extension}")
+    return os.path.join(os.path.dirname(dest_path), "@eaDir", filename, f"preview_{size}.{extension}")
+
+def generate_previews(image, dest_path, library_root):
+    """
+    Writes every configured preview size for dest_path from an already decoded PIL image.
+    Returns the list of written preview paths. Failures are logged and never stop processing.
+    """
+    written = []
+    if not previews_enabled():
+        return written
+
+    from PIL import Image
+
+    try:
+        transpose_name = EXIF_ORIENTATION_TRANSPOSE.get(image.getexif().get(0x0112))
+        transpose = Image.Transpose[transpose_name] if transpose_name else None
+        current = image
+        for size in PREVIEW_SIZES:
+            width, height = current.size
+            if max(width, height) > size:
+                scale = size / max(width, height)
+                new_size = (max(1, round(width * scale)), max(1, round(height * scale)))
+                current = current.resize(new_size, Image.Resampling.LANCZOS, reducing_gap=2.0)
+            if transpose is not None:
+                current = current.transpose(transpose)
+                transpose = None
+            if current.mode not in ("RGB", "L"):
+                current = current.convert("RGB")
+
+            buffer = BytesIO()
+            current.save(buffer, format=PREVIEW_FORMAT, quality=PREVIEW_QUALITY)
+            data = buffer.getvalue()
+
+            preview_path = get_preview_path(dest_path, size, library_root)
+            os.makedirs(os.path.dirname(preview_path), exist_ok=True)
+            with io_slot((preview_path, len(data))):
+                with open(preview_path, "wb") as f:
+                    f.write(data)
+            written.append(preview_path)
+            log_debug(f"Preview {size}px written: {preview_path}")
+
+    except Exception as e:
+        log_warning(f"Preview generation failed for {dest_path}: {type(e).__name__} - {e}")
+
+    return written
@@ -0,0 +1,161 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Chris Polewiak
+
+"""
+profile_utils.py
+
+Purpose:
+    Built-in profiling mode: cProfile statistics and tracemalloc allocation snapshots per batch of files,
+    written to LOGS_DIR so slow cycles can be analyzed on production data.
+
+Main Functions:
+    - set_profiling_mode(enabled): Enables or disables profiling (also enabled by PROFILE_MODE=true).
+    - BatchProfiler(label): Collects statistics while files are processed; does nothing when profiling is disabled.
+        - start(): Starts cProfile and tracemalloc.
+        - file_done(): Counts a processed file and writes a snapshot every PROFILE_EVERY_N_FILES files.
+        - stop(): Writes the last snapshot and stops profiling.
+
+Configuration (environment variables):
+    - PROFILE_MODE: "true" enables profiling.
+    - PROFILE_EVERY_N_FILES: Files per snapshot (default 50, at least 1).
+    - PROFILE_KEEP: Number of snapshots kept in LOGS_DIR/profiles (default 20).
+    - PROFILE_TOP: Number of functions and allocation sites listed in each report (default 25).
+
+Each snapshot is a .pstats file (open with `python -m pstats` or snakeviz) and a .txt report with
+the top functions by cumulative time and the top allocation sites of the batch (memory growth
+compared to the previous snapshot, not everything allocated since profiling started).
+The profiling modules are imported only when profiling is enabled.
+"""
+
+import os
+import io
+import glob
+import time
+from datetime import datetime
+from utils.log_utils import *
+
+
+PROFILE_DIR = os.path.join(os.environ.get("LOGS_DIR", "./logs"), "profiles")
+PROFILE_EVERY_N_FILES = max(1, int(os.environ.get("PROFILE_EVERY_N_FILES", 50)))
+PROFILE_KEEP = int(os.environ.get("PROFILE_KEEP", 20))
+PROFILE_TOP = int(os.environ.get("PROFILE_TOP", 25))
+
+is_profiling = os.environ.get("PROFILE_MODE", "").lower() == "true"
+def set_profiling_mode(enabled: bool):
+    global is_profiling
+    is_profiling = enabled
+
+
+class BatchProfiler:
+    def __init__(self, label):
+        self.label = label
+        self.enabled = is_profiling
+        self.profiler = None
+        self.previous_snapshot = None
+        self.files = 0
+        self.batch = 0
+        self.batch_start = 0
+
+    def start(self):
+        if not self.enabled:
+            return
+        import cProfile
+        import tracemalloc
+        try:
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+        except Exception as e:
+            log_warning(f"Could not create profile directory: {PROFILE_DIR} — {e}")
+            self.enabled = False
+            return
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self.previous_snapshot = self._take_memory_snapshot()
+        self.profiler = cProfile.Profile()
+        self.batch_start = time.time()
+        self.profiler.enable()
+        log_info(f"Profiling enabled: {self.label}, snapshot every {PROFILE_EVERY_N_FILES} files -> {PROFILE_DIR}")
+
+    def file_done(self):
+        if not self.enabled or not self.profiler:
+            return
+        self.files += 1
+        if self.files % PROFILE_EVERY_N_FILES == 0:
+            self._snapshot()
+            self.profiler.enable()
+
+    def stop(self):
+        if not self.enabled or not self.profiler:
+            return
+        import tracemalloc
+        if self.files % PROFILE_EVERY_N_FILES:
+            self._snapshot()
+        else:
+            self.profiler.disable()
+        self.profiler = None
+        self.previous_snapshot = None
+        tracemalloc.stop()
+
+    def _snapshot(self):
+        """
+        Writes the statistics collected since the previous snapshot and resets the counters.
+        """
+        import cProfile
+        import pstats
+        import tracemalloc
+
+        self.profiler.disable()
+        self.batch += 1
+        elapsed = time.time() - self.batch_start
+        base_name = f"{self.label}-{datetime.now():%Y%m%d-%H%M%S}-{self.batch:04}"
+        pstats_path = os.path.join(PROFILE_DIR, f"{base_name}.pstats")
+        report_path = os.path.join(PROFILE_DIR, f"{base_name}.txt")
+
+        try:
+            self.profiler.dump_stats(pstats_path)
+
+            stats_text = io.StringIO()
+            pstats.Stats(self.profiler, stream=stats_text).sort_stats("cumulative").print_stats(PROFILE_TOP)
+
+            snapshot = self._take_memory_snapshot()
+            # Traces live until freed, so only the difference to the previous snapshot belongs to this batch
+            allocations = snapshot.compare_to(self.previous_snapshot, "lineno")
+            self.previous_snapshot = snapshot
+            current, peak = tracemalloc.get_traced_memory()
+
+            with open(report_path, "w", encoding="utf-8") as f:
+                f.write(f"{self.label} batch {self.batch}: {self.files} files total, {elapsed:.2f}s in batch\n")
+                f.write(f"Traced memory: current {current / 1024 / 1024:.1f} MB, peak {peak / 1024 / 1024:.1f} MB\n\n")
+                f.write(f"Top {PROFILE_TOP} functions by cumulative time:\n")
+                f.write(stats_text.getvalue())
+                f.write(f"\nTop {PROFILE_TOP} allocation sites (change since previous snapshot):\n")
+                for stat in allocations[:PROFILE_TOP]:
+                    f.write(f"{stat}\n")
+
+            log_info(f"Profile snapshot written: {pstats_path} ({elapsed:.2f}s, peak {peak / 1024 / 1024:.1f} MB)")
+        except Exception as e:
+            log_warning(f"Could not write profile snapshot {base_name}: {e}")
+
+        tracemalloc.reset_peak()
+        self._rotate()
+        self.profiler = cProfile.Profile()
+        self.batch_start = time.time()
+
+    def _take_memory_snapshot(self):
+        import tracemalloc
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+
+    def _rotate(self):
+        """
+        Keeps only the newest PROFILE_KEEP snapshots.
+        """
+        snapshots = sorted(glob.glob(os.path.join(PROFILE_DIR, "*.pstats")), key=os.path.getmtime)
+        for old in snapshots[:-PROFILE_KEEP] if PROFILE_KEEP > 0 else []:
+            for path in (old, old[:-len(".pstats")] + ".txt"):
+                try:
+                    os.remove(path)
+                    log_debug(f"Removed old profile snapshot: {path}")
+                except OSError:
+                    pass
@@ -0,0 +1,169 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Chris Polewiak
+
+"""
+queue_utils.py
+
+Purpose:
+    Fair scheduling of pending files across multiple import roots (e.g. one folder per family member),
+    so one large dump does not delay small uploads from other roots.
+
+Main Functions:
+    - load_import_roots(source_dir): Returns the configured import roots from .import_roots.json,
+      always including a default root for SOURCE_DIR.
+    - iter_root_files(root, roots): Yields the files of one root, without descending into nested roots.
+    - ImportRoot: One import folder with its weight, default owner and throughput statistics.
+    - FairQueue(roots): Weighted fair queue of pending files.
+        - refresh(): Rescans all roots and queues files not seen before.
+        - next(): Returns the next (root, file) pair, or None when all queues are empty.
+        - done(root, seconds, success): Records the result of a processed file.
+        - backlog(): Returns the number of queued files.
+        - log_stats(): Logs per-root throughput and backlog.
+
+Scheduling:
+    Each root has a virtual time that advances by 1/weight for every file taken from it, and the root
+    with the lowest virtual time is served next. A root that was idle starts at the current virtual time,
+    so it is served right away but cannot claim credit for the time it was empty.
+
+.import_roots.json example:
+    {
+      "default": {"weight": 1},
+      "anna": {"path": "anna", "weight": 2, "owner": {"author": "Anna", "copyright": "", "label": "Anna"}}
+    }
+    Relative paths are resolved against SOURCE_DIR. "owner" is used when the camera is not listed in .camera_owners.json.
+"""
+
+import os
+import json
+from collections import deque
+from utils.log_utils import *
+from utils.file_utils import iter_files_from_directory
+from utils.io_utils import order_by_directory
+
+
+IMPORT_ROOTS_FILE = os.environ.get("IMPORT_ROOTS_FILE", ".import_roots.json")
+DEFAULT_ROOT_NAME = "default"
+
+
+class ImportRoot:
+    def __init__(self, name, path, weight=1, owner=None):
+        self.name = name
+        self.path = os.path.normpath(path)
+        self.weight = max(float(weight), 0.01)
+        self.owner = owner
+        self.queue = deque()
+        self.vtime = 0.0
+        self.processed = 0
+        self.failed = 0
+        self.seconds = 0.0
+
+    def files_per_minute(self):
+        return self.processed / self.seconds * 60 if self.seconds else 0
+
+    def __repr__(self):
+        return f"ImportRoot({self.name}, {self.path}, weight={self.weight})"
+
+
+def load_import_roots(source_dir):
+    """
+    Loads import roots from IMPORT_ROOTS_FILE. Without the file, SOURCE_DIR is the only root.
+    """
+    config = {}
+    if os.path.exists(IMPORT_ROOTS_FILE):
+        try:
+            with open(IMPORT_ROOTS_FILE, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+        except Exception as e:
+            log_warning(f"Could not read {IMPORT_ROOTS_FILE}, using SOURCE_DIR only: {e}")
+            config = {}
+
+    default = config.pop(DEFAULT_ROOT_NAME, {})
+    roots = [ImportRoot(DEFAULT_ROOT_NAME, source_dir, default.get("weight", 1), default.get("owner"))]
+    for name, root_config in config.items():
+        path = os.path.join(source_dir, root_config.get("path", name))
+        roots.append(ImportRoot(name, path, root_config.get("weight", 1), root_config.get("owner")))
+
+    for root in roots:
+        log_debug(f"Import root: {root}")
+    return roots
+
+
+def iter_root_files(root, roots):
+    """
+    Yields the files that belong to root. Nested roots are pruned from the walk,
+    so the default root does not rescan every named root's subtree.
+    """
+    nested = [
+        other.path for other in roots
+        if other is not root and other.path.startswith(root.path + os.sep)
+        ]
+    yield from iter_files_from_directory(root.path, exclude_dirs=nested)
+
+
+class FairQueue:
+    def __init__(self, roots):
+        self.roots = roots
+        self.seen = set()
+        self.vtime = 0.0
+        for root in roots:
+            root.vtime = 0.0
+            root.queue.clear()
+        # Deepest roots first, so a file in a nested root is not claimed by its parent
+        self._by_depth = sorted(roots, key=lambda r: len(r.path), reverse=True)
+
+    def _owning_root(self, file_path):
+        for root in self._by_depth:
+            if file_path == root.path or file_path.startswith(root.path + os.sep):
+                return root
+        return None
+
+    def refresh(self):
+        """
+        Rescans every root and appends files that have not been queued yet.
+        """
+        added = 0
+        for root in self.roots:
+            new_files = []
+            for file_path in iter_root_files(root, self.roots):
+                if file_path in self.seen or self._owning_root(file_path) is not root:
+                    continue
+                self.seen.add(file_path)
+                new_files.append(file_path)
+            if new_files:
+                if not root.queue:
+                    # Idle root re-joins at the current virtual time
+                    root.vtime = max(root.vtime, self.vtime)
+                root.queue.extend(order_by_directory(new_files))
+                added += len(new_files)
+        log_debug(f"Queue refreshed: {added} new files, backlog {self.backlog()}")
+        return added
+
+    def next(self):
+        """
+        Returns the next (root, file_path) in weighted fair order, or None if nothing is queued.
+        """
+        active = [root for root in self.roots if root.queue]
+        if not active:
+            return None
+        root = min(active, key=lambda r: r.vtime + 1 / r.weight)
+        root.vtime += 1 / root.weight
+        self.vtime = root.vtime
+        return root, root.queue.popleft()
+
+    def done(self, root, seconds, success=True):
+        root.seconds += seconds
+        if success:
+            root.processed += 1
+        else:
+            root.failed += 1
+
+    def backlog(self):
+        return sum(len(root.queue) for root in self.roots)
+
+    def log_stats(self):
+        for root in self.roots:
+            if root.processed or root.failed or root.queue:
+                log_info(
+                    f"Root '{root.name}': processed {root.processed}, failed {root.failed}, "
+                    f"{root.files_per_minute():.1f} files/min, backlog {len(root.queue)}"
+                    )
@@ -0,0 +1,153 @@
+# SPDX-License-Identifier: MIT
+# Copyright (c) 2025 Chris Polewiak
+
+"""
+triage_utils.py
+
+Purpose:
+    Cheap local pre-filter that recognizes images which gain nothing from an Azure caption
+    (screenshots, near-black pocket shots, blank frames, document scans) and tags them locally.
+
+Main Functions:
+    - classify_image(image, exif_data, filename, size): Returns a triage category or None if the image should be analyzed by Azure.
+    - get_triage_metadata(category): Returns metadata (keywords) to write for a triaged image.
+
+Configuration (environment variables):
+    - TRIAGE_ENABLED: "true" enables the pre-filter (default disabled).
+    - TRIAGE_KEYWORDS: JSON object mapping category -> list of keywords. Only listed categories are detected, e.g.
+      {"screenshot": ["Screenshot"], "dark": ["Dark"], "blank": ["Blank"], "document": ["Document"]}
+    - TRIAGE_SCREENSHOT_MIN_RATIO: Minimal long/short edge ratio of a screenshot without explicit screenshot hints (default 1.9).
+      The ratio is only trusted together with a second signal: no camera, no DateTimeOriginal and the exact
+      pixel size of a known phone screen, so EXIF-less forwarded photos and panoramas still go to Azure.
+    - TRIAGE_DARK_MAX_MEAN: Maximal mean brightness (0-255) of a near-black image (default 16).
+    - TRIAGE_DARK_MAX_STDDEV: Maximal brightness standard deviation of a near-black image (default 6).
+      A pocket shot is both dark and flat; night-sky or stage photos are dark but have contrast and still go to Azure.
+    - TRIAGE_BLANK_MAX_STDDEV: Maximal brightness standard deviation of a blank frame (default 4).
+
+Decisions use EXIF hints (camera make, Software, UserComment), the file name, the aspect ratio
+and statistics of a ~64px reduced copy, so a triage check costs a few milliseconds.
+"""
+
+import os
+import json
+from utils.log_utils import *
+
+
+TRIAGE_ENABLED = os.environ.get("TRIAGE_ENABLED", "").lower() == "true"
+TRIAGE_SCREENSHOT_MIN_RATIO = float(os.environ.get("TRIAGE_SCREENSHOT_MIN_RATIO", 1.9))
+TRIAGE_DARK_MAX_MEAN = float(os.environ.get("TRIAGE_DARK_MAX_MEAN", 16))
+TRIAGE_DARK_MAX_STDDEV = float(os.environ.get("TRIAGE_DARK_MAX_STDDEV", 6))
+TRIAGE_BLANK_MAX_STDDEV = float(os.environ.get("TRIAGE_BLANK_MAX_STDDEV", 4))
+
+DEFAULT_TRIAGE_KEYWORDS = {
+    "screenshot": ["Screenshot"],
+    "dark": ["Dark"],
+    "blank": ["Blank"],
+    "document": ["Document"],
+}
+
+SCREENSHOT_HINTS = ("screenshot", "screen shot", "zrzut ekranu")
+DOCUMENT_SOFTWARE_HINTS = ("scanner", "camscanner", "adobe scan", "office lens", "microsoft lens", "genius scan", "scanbot")
+
+# Portrait (short, long) pixel sizes of common phone screens
+KNOWN_SCREEN_SIZES = {
+    (640, 1136), (750, 1334), (828, 1792), (1125, 2436), (1170, 2532), (1179, 2556),
+    (1206, 2622), (1242, 2208), (1242, 2688), (1284, 2778), (1290, 2796), (1320, 2868),
+    (720, 1600), (1080, 2220), (1080, 2280), (1080, 2340), (1080, 2400), (1080, 2408),
+    (1080, 2412), (1220, 2712), (1260, 2800), (1344, 2992), (1440, 3088), (1440, 3120),
+    (1440, 3200),
+}
+
+TRIAGE_THUMB_SIZE = 64
+
+
+def _load_triage_keywords():
+    raw = os.environ.get("TRIAGE_KEYWORDS", "").strip()
+    if not raw:
+        return DEFAULT_TRIAGE_KEYWORDS
+    try:
+        config = json.loads(raw)
+    except Exception as e:
+        log_warning(f"Invalid TRIAGE_KEYWORDS, using defaults: {e}")
+        return DEFAULT_TRIAGE_KEYWORDS
+
+    triage_keywords = {}
+    for category, keywords in config.items():
+        # A single string is one keyword, not a list of characters
+        if isinstance(keywords, str):
+            keywords = [keywords]
+        if not isinstance(keywords, list) or not all(isinstance(kw, str) for kw in keywords):
+            log_warning(f"TRIAGE_KEYWORDS: keywords for '{category}' must be a string or a list of strings — category disabled")
+            continue
+        triage_keywords[category] = keywords
+    return triage_keywords
+
+TRIAGE_KEYWORDS = _load_triage_keywords()
+
+
+def _exif_text(exif_data, tag):
+    """
+    Returns an EXIF value as lower-case text (UserComment is bytes with an 8-byte charset prefix).
+    """
+    value = exif_data.get(tag, '')
+    if isinstance(value, bytes):
+        value = value[8:] if value[:8] in (b'ASCII\x00\x00\x00', b'UNICODE\x00') else value
+        value = value.decode('utf-8', errors='ignore')
+    return str(value).strip('\x00 ').lower()
+
+def classify_image(image, exif_data, filename, size=None):
+    """
+    Returns the triage category of the image ("screenshot", "dark", "blank", "document"),
+    or None if the image should go to Azure. Always returns None when triage is disabled.
+    Pass size (the original pixel size) when the image was decoded at reduced size.
+    """
+    if not TRIAGE_ENABLED:
+        return None
+
+    try:
+        has_camera = bool(_exif_text(exif_data, 271) or _exif_text(exif_data, 272))
+        software = _exif_text(exif_data, 305)
+        user_comment = _exif_text(exif_data, 37510)
+        name = os.path.basename(filename).lower()
+
+        width, height = size or image.size
+        ratio = max(width, height) / max(1, min(width, height))
+
+        if "screenshot" in TRIAGE_KEYWORDS and not has_camera:
+            if any(hint in text for hint in SCREENSHOT_HINTS for text in (software, user_comment, name)):
+                return "screenshot"
+            has_capture_date = bool(_exif_text(exif_data, 36867))
+            screen_size = (min(width, height), max(width, height)) in KNOWN_SCREEN_SIZES
+            if ratio >= TRIAGE_SCREENSHOT_MIN_RATIO and screen_size and not has_capture_date:
+                return "screenshot"
+
+        if "document" in TRIAGE_KEYWORDS and any(hint in software for hint in DOCUMENT_SOFTWARE_HINTS):
+            return "document"
+
+        if not {"dark", "blank"} & TRIAGE_KEYWORDS.keys():
+            return None
+
+        from PIL import ImageStat
+
+        # Statistics of a tiny box-reduced copy are enough for brightness decisions
+        factor = max(1, max(image.size) // TRIAGE_THUMB_SIZE)
+        thumb = image.reduce(factor).convert("L")
+        stat = ImageStat.Stat(thumb)
+        mean, stddev = stat.mean[0], stat.stddev[0]
+        log_debug(f"Triage stats: mean={mean:.1f} stddev={stddev:.1f} ratio={ratio:.2f} camera={has_camera}")
+
+        if "dark" in TRIAGE_KEYWORDS and mean <= TRIAGE_DARK_MAX_MEAN and stddev <= TRIAGE_DARK_MAX_STDDEV:
+            return "dark"
+        if "blank" in TRIAGE_KEYWORDS and stddev <= TRIAGE_BLANK_MAX_STDDEV:
+            return "blank"
+
+    except Exception as e:
+        log_warning(f"Triage failed for {filename}: {type(e).__name__} - {e}")
+
+    return None
+
+def get_triage_metadata(category):
+    """
+    Returns metadata in the same shape as image_analyse() for a locally triaged image.
+    """
+    return {"caption": '', "keywords": list(TRIAGE_KEYWORDS.get(category, []))}